@@ -1,15 +1,140 @@
-from src.cross_section_read import CrossSectionReader
-from src.vt_calc import VelocitySampler
-from src.simulation import simulate_single_particle
+from src.cross_section_read import CrossSectionReader, _macroscopic_xs_kernel, _SCATTER_A
+from src.vt_calc import VelocitySampler, _sample_velocity_kernel
+from src.physics import (
+    _V_FACTOR, _E_cm_prime_kernel, _elastic_kernel, _rotate_direction,
+    sample_collision, SCATTER, CAPTURE, FISSION
+)
 from src.material import Material
 from src.medium import Region, Sphere
-from src.tally import Tally
-from src.random_number_generator import RNGHandler
 from src.settings import Settings
-from multiprocessing import Pool
+from src.simulation import ALIVE, ESCAPED, KILLED, ABSORBED
+from src.jit import njit, prange
+import math
 import time
 import numpy as np
 
+@njit(cache=True)
+def _cm_energy(E, A, beta):
+    """
+    CM energy with free-gas target sampling in the thermal range (see calculate_E_cm_prime).
+    """
+    v_t = 0.0
+    if E < 10:
+        v_t = _sample_velocity_kernel(math.sqrt(_V_FACTOR * E), beta, 1000)
+        if v_t < 0:
+            # Same failure as VelocitySampler.sample_velocity
+            raise ValueError("Failed to find an accepted sample within the maximum attempts")
+    return _E_cm_prime_kernel(E, A, v_t)
+
+@njit(cache=True)
+def _step_to_boundary(x, y, z, u, v, w, R2):
+    """
+    Distance along (u, v, w) to the surface of a sphere centred at the origin.
+    Returns inf if the particle is outside the sphere.
+    """
+    c = x * x + y * y + z * z - R2
+    if c > 1e-9:
+        return np.inf
+    b = x * u + y * v + z * w
+    disc = b * b - c
+    return -b + math.sqrt(max(disc, 0.0))
+
+@njit(cache=True)
+def _thermal_collision(E, xi_reaction, xi_mu, xs_data, A, N, beta):
+    """
+    sample_collision below 10 eV, where the CM energies depend on the sampled
+    target velocity: per-reaction lookups and free-gas kinematics.
+    """
+    E_cm = _cm_energy(E, _SCATTER_A, beta)  # Same mass ratio as get_cross_sections
+    sigma_s, sigma_a, sigma_f, Sigma_t = _macroscopic_xs_kernel(xs_data, E, E_cm, N)
+    p_s = sigma_s / Sigma_t if Sigma_t > 0 else 1.0
+    p_sa = (sigma_s + sigma_a) / Sigma_t if Sigma_t > 0 else 1.0
+
+    if xi_reaction < p_s:
+        reaction = SCATTER
+    elif xi_reaction < p_sa:
+        reaction = CAPTURE
+    else:
+        reaction = FISSION
+
+    E_prime, mu_lab = _elastic_kernel(E, _cm_energy(E, A, beta), A, 2 * xi_mu - 1)
+    return Sigma_t, p_s, reaction, E_prime, mu_lab
+
+@njit(parallel=True, cache=True)
+def run_all(x, y, z, u, v, w, E, wt, seeds, result, xs_data, mat_tables, R2, A, N, beta,
+            implicit_capture, weight_cutoff, survival_prob):
+    """
+    Transport every particle of the bank through a sphere of radius sqrt(R2)
+    centred at the origin, one particle per prange iteration.
+    mat_tables is the output of CrossSectionReader.build_material_tables, used
+    above the thermal range; below it the per-reaction tables are looked up.
+    Arrays are updated in place; result receives the final code of each particle.
+    """
+    for i in prange(len(E)):
+        # Seed the thread's generator per particle so histories do not
+        # depend on how iterations are scheduled
+        np.random.seed(seeds[i])
+
+        while True:
+            # 1. DISTANCE TO THE SPHERE
+            d_boundary = _step_to_boundary(x[i], y[i], z[i], u[i], v[i], w[i], R2)
+            if d_boundary == np.inf:
+                result[i] = ESCAPED
+                break
+
+            # 2. CROSS SECTIONS, REACTION AND SCATTERING KINEMATICS IN ONE PASS
+            xi_reaction = np.random.random()
+            xi_mu = np.random.random()
+            if E[i] >= 10:
+                Sigma_t, p_s, reaction, E_prime, mu_lab = sample_collision(
+                    E[i], xi_reaction, xi_mu, mat_tables, A
+                )
+            else:
+                Sigma_t, p_s, reaction, E_prime, mu_lab = _thermal_collision(
+                    E[i], xi_reaction, xi_mu, xs_data, A, N, beta
+                )
+
+            # 3. DISTANCE TO COLLISION
+            if Sigma_t <= 0:
+                si = np.inf
+            else:
+                si = -math.log(1 - np.random.random()) / Sigma_t
+
+            # 4. ESCAPE: crossing the sphere surface leaves the geometry
+            if si > d_boundary:
+                result[i] = ESCAPED
+                break
+
+            x[i] += si * u[i]
+            y[i] += si * v[i]
+            z[i] += si * w[i]
+
+            # 5. COLLISION
+            if implicit_capture:
+                # A. Russian Roulette
+                if wt[i] < weight_cutoff:
+                    if np.random.random() < survival_prob:
+                        wt[i] /= survival_prob
+                    else:
+                        result[i] = KILLED
+                        break
+
+                # B. Weight Reduction
+                wt[i] *= p_s
+                if wt[i] <= 0:
+                    result[i] = KILLED
+                    break
+            else:
+                # Analog: scatter, absorb, or survive fission
+                if reaction == CAPTURE:
+                    result[i] = ABSORBED
+                    break
+
+            # 6. ELASTIC SCATTERING INTO THE NEW DIRECTION
+            phi = 2 * np.pi * np.random.random()
+            u[i], v[i], w[i] = _rotate_direction(u[i], v[i], w[i], mu_lab, phi)
+            E[i] = E_prime
+
 def benchmark():
     # 1. SETUP
     base_path = "./endfb"
@@ -34,66 +159,58 @@ def benchmark():
         element="Pb208"
     )
 
-    # We need a void "World" or just assume everything else is void?
-    # Your code loops through mediums. If no medium found, it returns "escaped".
-    # So just defining the sphere is enough.
-    mediums = [lead_sphere]
+    # Everything outside the sphere is void: crossing its surface means "escaped".
+
+    # Pre-load cross sections as plain arrays for the JIT kernel
+    xs_data = reader.get_xs_arrays(lead_sphere.element)
+    mat_tables = reader.build_material_tables(lead_sphere.element, N)
 
     # 4. SETTINGS
     # Shielding mode = Implicit Capture (Matches OpenMC default)
     N_PARTICLES = 10000
     settings = Settings(mode="shielding", particles=N_PARTICLES)
 
-    rngs = [RNGHandler(seed=12345 + i) for i in range(N_PARTICLES)]
-    tally = Tally()
-
-    # 5. SOURCE: Point(0,0,0), 1 MeV
-    particle_states = [
-        {
-            "x": 0.0, "y": 0.0, "z": 0.0,
-            # Isotropic direction
-            "theta": np.arccos(1 - 2 * rng.random()), # Sample cos(theta) uniformly
-            "phi": rng.uniform(0, 2 * np.pi),
-            "has_interacted": False,
-            "energy": 1.0e6,  # 1 MeV
-            "weight": 1.0
-        }
-        for rng in rngs
-    ]
-
-    args = [
-        (state, reader, mediums, A, N, sampler, None, False, rng, settings)
-        for state, rng in zip(particle_states, rngs)
-    ]
+    rng = np.random.default_rng(12345)
+
+    # 5. SOURCE: Point(0,0,0), 1 MeV, isotropic
+    # Particle bank stored as one array per coordinate.
+    # Position and direction are float32; energy and weight stay float64
+    x = np.zeros(N_PARTICLES, dtype=np.float32)
+    y = np.zeros(N_PARTICLES, dtype=np.float32)
+    z = np.zeros(N_PARTICLES, dtype=np.float32)
+    mu = 1 - 2 * rng.random(N_PARTICLES)  # Sample cos(theta) uniformly
+    phi = 2 * np.pi * rng.random(N_PARTICLES)
+    sin_theta = np.sqrt(1 - mu * mu)
+    u = (sin_theta * np.cos(phi)).astype(np.float32)
+    v = (sin_theta * np.sin(phi)).astype(np.float32)
+    w = mu.astype(np.float32)
+    E = np.full(N_PARTICLES, 1.0e6)  # 1 MeV
+    wt = np.ones(N_PARTICLES)
 
     print(f"Starting Benchmark: Pb-208 Sphere (R=10cm), 1 MeV Source")
 
-    with Pool() as pool:
-        partial_results = pool.map(simulate_single_particle, args)
+    seeds = 12345 + np.arange(N_PARTICLES)
+    result = np.full(N_PARTICLES, ALIVE, dtype=np.int8)
 
-    # 6. ANALYZE RESULTS
-    total_weight_escaped = 0.0
-    escaped_energies = []
-
-    for res in partial_results:
-        # In Implicit capture (Shielding), particles "escape" with a weight.
-        # "escaped" means they hit the boundary.
-        # "killed" means they died via Roulette inside.
+    run_all(
+        x, y, z, u, v, w, E, wt, seeds, result, xs_data, mat_tables, 10.0**2, A, N, sampler.beta,
+        settings.use_implicit_capture, settings.weight_cutoff, settings.roulette_survival_prob
+    )
 
-        if res["result"] == "escaped":
-            w = res["final_weight"]
-            e = res["final_energy"]
-            total_weight_escaped += w
-            # Weighted average calculation
-            escaped_energies.append((e, w))
+    # 6. ANALYZE RESULTS
+    # In Implicit capture (Shielding), particles "escape" with a weight.
+    # ESCAPED means they hit the boundary.
+    # KILLED means they died via Roulette inside.
+    escaped = result == ESCAPED
+    w_escaped = wt[escaped]
+    total_weight_escaped = w_escaped.sum()
 
     # Calculate Metrics
     leakage_fraction = total_weight_escaped / N_PARTICLES
 
-    if escaped_energies:
-        numerator = sum(e * w for e, w in escaped_energies)
-        denominator = sum(w for _, w in escaped_energies)
-        avg_escape_energy = numerator / denominator
+    if total_weight_escaped > 0:
+        # Weighted average calculation
+        avg_escape_energy = (E[escaped] * w_escaped).sum() / total_weight_escaped
     else:
         avg_escape_energy = 0.0
 
@@ -1,20 +1,41 @@
 # main.py
 from src.cross_section_read import CrossSectionReader
 from src.vt_calc import VelocitySampler
-from src.simulation import simulate_single_particle
+from src.simulation import simulate_particle_chunk
 from src.material import Material
 from src.medium import Region, Plane, Cylinder
 from src.tally import Tally
-from src.random_number_generator import RNGHandler
 from src.settings import Settings
 from src.mesh import MeshTally
 
-from multiprocessing import Pool
+import multiprocessing as mp
+import sys
 import json
 import time
 import numpy as np
 from collections import deque
 
+# Particles per worker task
+CHUNK_SIZE = 1000
+
+# Simulation context shared by every task: reader, mediums, A, N, sampler,
+# region_bounds, track, settings. Filled in the parent before the Pool starts,
+# so forked workers inherit it (and the loaded cross sections) copy-on-write
+# instead of receiving a pickled copy with each task.
+_CTX = {}
+
+def _init_worker(ctx):
+    """Pool initializer for spawn/forkserver start methods, which do not inherit _CTX."""
+    _CTX.update(ctx)
+
+def run_chunk(task):
+    """Worker task: simulate one chunk of (states, seed sequences) in the shared context."""
+    states, seed_seqs = task
+    return simulate_particle_chunk((
+        states, _CTX["reader"], _CTX["mediums"], _CTX["A"], _CTX["N"], _CTX["sampler"],
+        _CTX["region_bounds"], _CTX["track"], seed_seqs, _CTX["settings"]
+    ))
+
 def main():
     # 1. SETUP
     base_path = "./endfb"
@@ -29,11 +50,8 @@ def main():
 
     for elem in elements_to_load:
         try:
-            # We request a dummy energy (1.0 eV) to trigger the file read
-            # MT=2 (Elastic), MT=102 (Capture) are the essentials
-            reader.get_cross_section(elem, 2, 1.0)
-            reader.get_cross_section(elem, 102, 1.0)
-            # reader.get_cross_section(elem, 18, 1.0) # Uncomment if using Fissionable material
+            # MT=2 (Elastic), MT=102 (Capture) and MT=18 (Fission, if present)
+            reader.preload([elem], mts=[2, 102, 18])
         except Exception as e:
             print(f"Warning: Could not pre-load {elem}: {e}")
     print("Pre-loading complete.")
@@ -88,51 +106,70 @@ def main():
     # -----------------------------
 
     num_particles = settings.num_particles
-    rngs = [RNGHandler(seed=12345 + i) for i in range(num_particles)]
+    # Independent, reproducible substream per particle (PCG64 generators
+    # are built from these in the workers)
+    seed_seqs = np.random.SeedSequence(12345).spawn(num_particles)
     tally = Tally()
 
+    # Sample the whole source bank at once
+    source_rng = np.random.default_rng(12345)
+    thetas = source_rng.uniform(0, np.pi, num_particles)
+    phis = source_rng.uniform(0, 2 * np.pi, num_particles)
+
     particle_states = [
         {
             "x": -10.5, "y": 0.0, "z": 0.0,
-            "theta": rng.uniform(0, np.pi),
-            "phi": rng.uniform(0, 2 * np.pi),
+            "theta": theta,
+            "phi": phi,
             "has_interacted": False,
             "energy": 50,  # 50 eV
             "weight": 1.0
         }
-        for rng in rngs
+        for theta, phi in zip(thetas.tolist(), phis.tolist())
     ]
 
     all_trajectories = {}
     region_bounds = (14.9, 15.1, -15, 15, -15, 15)
     track = False
 
-    args = [
-        (state, reader, mediums, A, N, sampler, region_bounds, track, rng, settings)
-        for state, rng in zip(particle_states, rngs)
+    # One task per chunk of particles; each returns compact arrays (see RESULT_DT)
+    tasks = [
+        (particle_states[start:start + CHUNK_SIZE], seed_seqs[start:start + CHUNK_SIZE])
+        for start in range(0, num_particles, CHUNK_SIZE)
     ]
+    ctx = {
+        "reader": reader, "mediums": mediums, "A": A, "N": N, "sampler": sampler,
+        "region_bounds": region_bounds, "track": track, "settings": settings,
+    }
+    _CTX.update(ctx)
 
     print(f"Starting simulation of {num_particles} particles...")
 
     sim_start_time = time.perf_counter()
-    with Pool() as pool:
-        partial_results = pool.map(simulate_single_particle, args)
+    if mp.get_start_method() == "fork":
+        pool = mp.Pool()
+    else:
+        pool = mp.Pool(initializer=_init_worker, initargs=(ctx,))
+    with pool:
+        chunk_results = pool.map(run_chunk, tasks)
     sim_end_time = time.perf_counter()
 
     # Merge results and SCORE MESH
-    for idx, result in enumerate(partial_results):
-        tally.merge_partial_results(result)
+    idx = 0
+    for records, absorbed_events, trajectories in chunk_results:
+        # The events are scored into the mesh below, not stored on the tally
+        tally.merge_chunk_results(records, absorbed_events, keep_coordinates=False)
 
         # --- FILL THE MESH ---
-        # Implicit capture returns (x, y, z, weight_lost) in 'absorbed_coords'
-        if result["absorbed_coords"]:
-            for event in result["absorbed_coords"]:
-                x, y, z, w = event
-                mesh.score(x, y, z, w)
+        # Implicit capture records (x, y, z, weight_lost) per absorption event
+        for x, y, z, w in absorbed_events.tolist():
+            mesh.score(x, y, z, w)
         # ---------------------
 
-        if result["trajectory"]:
-            all_trajectories[idx + 1] = result["trajectory"]
+        for trajectory in trajectories or []:
+            if trajectory:
+                all_trajectories[idx + 1] = trajectory
+            idx += 1
 
     # Export Data
     mesh.write_vtk("dose_map.vtk") # <--- Generates the visualization file
@@ -146,4 +183,9 @@ def main():
     print(f"Rate: {num_particles / (sim_end_time - sim_start_time):.0f} particles/s")
 
 if __name__ == "__main__":
+    # fork lets the workers share the pre-loaded cross sections copy-on-write.
+    # Only on Linux: fork is unsafe with the macOS system frameworks, and
+    # Windows has no fork.
+    if sys.platform.startswith("linux"):
+        mp.set_start_method("fork")
     main()
@@ -1,22 +1,165 @@
 ### src/cross_section_read.py ###
-from .physics import calculate_E_cm_prime
+from .physics import calculate_E_cm_prime, _grid_search, _grid_interp
+from .jit import njit
+import math
 import os
+import weakref
 import h5py
 import numpy as np
 
+# Reactions packed by _build_xs_arrays: scattering, radiative capture, fission
+_REACTIONS = (2, 102, 18)
+
+# Mass ratio used for the CM energy of the scattering lookup (2.5 is A for now)
+_SCATTER_A = 2.5
+
+
+def _log_grid_index(grid, n_buckets):
+    """
+    Index of an evaluated energy grid by uniform log-energy buckets, as in
+    OpenMC's logarithmic grid hashing: bucket k starts at
+    exp(logE0 + k / inv_dlog), and grid_index[k] is the last grid point at or
+    below it, so a lookup only bisects the points of one bucket.
+    Returns (grid_index[n_buckets + 1], logE0, inv_dlog).
+    """
+    logE0 = math.log(grid[0])
+    logE1 = math.log(grid[-1])
+    inv_dlog = n_buckets / (logE1 - logE0) if logE1 > logE0 else 0.0
+    edges = np.exp(np.linspace(logE0, logE1, n_buckets + 1))
+    grid_index = np.searchsorted(grid, edges, side="right") - 1
+    return np.clip(grid_index, 0, len(grid) - 2), logE0, inv_dlog
+
+
+@njit(cache=True)
+def _xs_lookup(grid, xs, grid_index, logE0, inv_dlog, energy):
+    """
+    Linear interpolation on the evaluated grid, located through its log-energy index.
+    Returns 0 outside [grid[0], grid[-1]].
+    """
+    if energy < grid[0] or energy > grid[-1]:
+        return 0.0
+
+    i = _grid_search(grid, grid_index, logE0, inv_dlog, energy)
+    return _grid_interp(grid, xs, i, energy)
+
+
+def _xs_lookup_array(grid, xs, energies):
+    """
+    Vectorized _xs_lookup for an array of energies.
+    """
+    in_range = (energies >= grid[0]) & (energies <= grid[-1])
+    return np.where(in_range, np.interp(energies, grid, xs), 0.0)
+
+
+@njit(cache=True)
+def _packed_xs(grid, xs, E_range, r, i, energy):
+    """Reaction r of the packed element arrays at energy, which lies in grid interval i."""
+    if energy < E_range[r, 0] or energy > E_range[r, 1]:
+        return 0.0
+    return _grid_interp(grid, xs[r], i, energy)
+
+
+@njit(cache=True)
+def _macroscopic_xs_kernel(xs_data, energy, energy_cm, number_density):
+    """
+    Macroscopic (Sigma_s, Sigma_a, Sigma_f, Sigma_t) from the packed arrays of
+    one element (see CrossSectionReader.get_xs_arrays).
+    """
+    grid, xs, grid_index, logE0, inv_dlog, E_range = xs_data
+    scale = 1e-24 * number_density
+
+    i = _grid_search(grid, grid_index, logE0, inv_dlog, energy)
+    i_cm = _grid_search(grid, grid_index, logE0, inv_dlog, energy_cm)
+
+    Sigma_s = _packed_xs(grid, xs, E_range, 0, i_cm, energy_cm) * scale
+    Sigma_a = _packed_xs(grid, xs, E_range, 1, i, energy) * scale
+    Sigma_f = _packed_xs(grid, xs, E_range, 2, i, energy) * scale
+    return Sigma_s, Sigma_a, Sigma_f, Sigma_s + Sigma_a + Sigma_f
+
+
+def _reaction_path(element, mt):
+    """HDF5 group of reaction mt at 294 K in the file of element."""
+    return f"{element}/reactions/reaction_{mt:03}/294K"
+
+
+def _close_files(files):
+    """Close every HDF5 handle in files (used as the reader's finalizer)."""
+    for f in files.values():
+        try:
+            f.close()
+        except Exception:
+            pass
+    files.clear()
+
+
 class CrossSectionReader:
-    def __init__(self, base_path: str):
+    def __init__(self, base_path: str, n_buckets: int = 8000):
         """
         Initialize the CrossSectionReader with the base path to the data files.
         :param base_path: Base directory where HDF5 files are located.
+        :param n_buckets: Number of uniform log-energy buckets indexing each energy grid.
         """
         self.base_path = base_path
-        # Cache structure: {(element, mt): {'energy': np.array, 'xs': np.array}}
-        self._cache = {}
+        self.n_buckets = n_buckets
+        # Cache structure: {(element, mt): (grid, xs, grid_index, logE0, inv_dlog)}
+        self._cache: dict[tuple[str, int], tuple] = {}
+        # Whether the file of an element has a reaction: {(element, mt): bool}
+        self._has_mt: dict[tuple[str, int], bool] = {}
+        # Per-element arrays of _REACTIONS packed for the JIT kernels (see get_xs_arrays)
+        self._xs_arrays: dict[str, tuple] = {}
+        # {(element, number_density): output of build_material_tables}
+        self._material_tables = {}
+        self._init_files()
+
+    def _init_files(self):
+        """
+        Open HDF5 handles, one per element, kept for the life of the reader.
+        Handles belong to the process that opened them (see _get_file).
+        """
+        self._files: dict[str, h5py.File] = {}
+        self._files_pid = os.getpid()
+        # Closed when the reader is garbage collected or at interpreter exit
+        self._files_finalizer = weakref.finalize(self, _close_files, self._files)
+
+    def __getstate__(self):
+        # HDF5 handles cannot be pickled; workers reopen them lazily
+        state = self.__dict__.copy()
+        for key in ("_files", "_files_pid", "_files_finalizer"):
+            state.pop(key)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._init_files()
+
+    def _get_file(self, element: str):
+        """
+        Return the open HDF5 file of an element, opening it on first access.
+        Handles inherited through fork are not reused: the child opens its own.
+        """
+        if self._files_pid != os.getpid():
+            self._files_finalizer.detach()
+            self._init_files()
+
+        f = self._files.get(element)
+        if f is None:
+            file_path = os.path.join(self.base_path, f"neutron/{element}.h5")
+            if not os.path.exists(file_path):
+                raise FileNotFoundError(f"HDF5 file for {element} not found at {file_path}.")
+            f = h5py.File(file_path, 'r', swmr=True, rdcc_nbytes=16 << 20, rdcc_nslots=10007)
+            self._files[element] = f
+        return f
 
-    def _load_data_to_cache(self, element: str, mt: int):
+    def close(self):
+        """Close all open HDF5 files. They are reopened if needed again."""
+        _close_files(self._files)
+
+    def _load(self, element: str, mt: int):
         """
-        Internal method to load data from HDF5 into memory cache.
+        Internal method to load one reaction from HDF5 into the memory cache.
+        The evaluated data is kept as is from the reaction threshold on, with a
+        uniform log-energy index into its grid (see _log_grid_index).
+        Returns (grid, xs, grid_index, logE0, inv_dlog).
         """
         # Validate inputs
         if not element.isalnum():
@@ -24,48 +167,52 @@ class CrossSectionReader:
         if not (1 <= mt <= 999):
             raise ValueError("MT number must be between 1 and 999.")
 
-        mt_str = f"{mt:03}"
-        file_path = os.path.join(self.base_path, f"neutron/{element}.h5")
-
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"HDF5 file for {element} not found at {file_path}.")
-
-        reaction_group_path = f"{element}/reactions/reaction_{mt_str}/294K"
+        reaction_group_path = _reaction_path(element, mt)
         energy_path = f"{element}/energy/294K"
 
         try:
-            with h5py.File(file_path, 'r') as f:
-                # Load energy data
-                if energy_path not in f:
-                    raise KeyError(f"Energy data path '{energy_path}' not found in HDF5 file.")
-                energy_data = f[energy_path][:]
-
-                # Load cross-section data
-                if reaction_group_path not in f:
-                    raise KeyError(f"Reaction group path '{reaction_group_path}' not found in HDF5 file.")
-
-                xs_dataset = f[f"{reaction_group_path}/xs"]
-                xs_data = xs_dataset[:]
-                threshold_idx = xs_dataset.attrs.get('threshold_idx', 0)
-
-                # Validate threshold index
-                if not (0 <= threshold_idx < len(energy_data)):
-                    raise ValueError("Invalid threshold index in the HDF5 file.")
-
-                # Construct the full cross-section array in memory
-                xs_full = np.zeros_like(energy_data)
-                xs_full[threshold_idx:threshold_idx + len(xs_data)] = xs_data
-
-                # Store in cache
-                self._cache[(element, mt)] = {
-                    'energy': energy_data,
-                    'xs': xs_full,
-                    'threshold_energy': energy_data[threshold_idx] if threshold_idx < len(energy_data) else 0.0
-                }
+            f = self._get_file(element)
+
+            # Load energy data
+            if energy_path not in f:
+                raise KeyError(f"Energy data path '{energy_path}' not found in HDF5 file.")
+            energy_data = f[energy_path][:]
+
+            # Load cross-section data
+            if reaction_group_path not in f:
+                self._has_mt[(element, mt)] = False
+                raise KeyError(f"Reaction group path '{reaction_group_path}' not found in HDF5 file.")
+
+            xs_dataset = f[f"{reaction_group_path}/xs"]
+            xs_data = xs_dataset[:]
+            threshold_idx = xs_dataset.attrs.get('threshold_idx', 0)
 
+            # Validate threshold index
+            if not (0 <= threshold_idx < len(energy_data)):
+                raise ValueError("Invalid threshold index in the HDF5 file.")
+
+        except FileNotFoundError:
+            raise
         except (OSError, KeyError, ValueError) as e:
             raise RuntimeError(f"Error while reading HDF5 file: {e}") from e
 
+        # Construct the full cross-section array in memory
+        xs_full = np.zeros_like(energy_data)
+        xs_full[threshold_idx:threshold_idx + len(xs_data)] = xs_data
+
+        # Trim to the threshold
+        grid = np.ascontiguousarray(energy_data[threshold_idx:], dtype=np.float64)
+        # ENDF data carries ~4 significant digits, so float32 loses nothing and
+        # halves the memory traffic of the lookups; energies stay float64
+        xs = np.ascontiguousarray(xs_full[threshold_idx:], dtype=np.float32)
+
+        grid_index, logE0, inv_dlog = _log_grid_index(grid, self.n_buckets)
+
+        entry = (grid, xs, grid_index, logE0, inv_dlog)
+        self._has_mt[(element, mt)] = True
+        self._cache[(element, mt)] = entry
+        return entry
+
     def get_cross_section(self, element: str, mt: int, energy: float) -> float:
         """
         Get the cross-section for a specific nuclide, reaction, and energy using cached data.
@@ -73,17 +220,25 @@ class CrossSectionReader:
         cache_key = (element, mt)
 
         # Lazy loading: If data isn't in memory, load it now
-        if cache_key not in self._cache:
-            self._load_data_to_cache(element, mt)
+        if cache_key in self._cache:
+            entry = self._cache[cache_key]
+        else:
+            entry = self._load(element, mt)
 
-        data = self._cache[cache_key]
+        return _xs_lookup(*entry, energy)
 
-        # Optimization: Quick check for threshold
-        if energy < data['threshold_energy']:
-            return 0.0
+    def get_cross_section_array(self, element: str, mt: int, energies) -> np.ndarray:
+        """
+        Vectorized get_cross_section for an array of energies.
+        """
+        cache_key = (element, mt)
+        if cache_key in self._cache:
+            grid, xs = self._cache[cache_key][:2]
+        else:
+            grid, xs = self._load(element, mt)[:2]
 
-        # Fast in-memory interpolation
-        return np.interp(energy, data['energy'], data['xs'])
+        energies = np.asarray(energies, dtype=np.float64)
+        return _xs_lookup_array(grid, xs, energies)
 
     def calculate_macroscopic_xs(self, microscopic_xs: float, number_density: float) -> float:
         if microscopic_xs < 0:
@@ -98,26 +253,120 @@ class CrossSectionReader:
         microscopic_xs = self.get_cross_section(element, mt, energy)
         return self.calculate_macroscopic_xs(microscopic_xs, number_density)
 
-    def get_cross_sections(self, element, energy, sampler, number_density):
+    def preload(self, elements, mts=_REACTIONS):
         """
-        Get energy-dependent macroscopic cross sections for a given element and energy.
+        Load the reactions mts of each element, and the packed tables used by
+        get_cross_sections, into memory. Worker processes forked afterwards
+        inherit the cache instead of reading the files.
+        Reactions missing from a file (e.g. fission in Pb208) are skipped.
         """
-        # Get microscopic cross-sections and convert to macroscopic
-        energy_cm = calculate_E_cm_prime(energy, 2.5, sampler)  # 2.5 is A for now
+        for element in elements:
+            for mt in mts:
+                if (element, mt) not in self._cache and self.has_reaction(element, mt):
+                    self._load(element, mt)
+            self.get_xs_arrays(element)
 
-        # Calculate each macroscopic cross section directly
-        # Note: We query the cache for MT=2 and MT=102
-        Sigma_s = self.get_macroscopic_xs(element, 2, energy_cm, number_density)     # Scattering
-        Sigma_a = self.get_macroscopic_xs(element, 102, energy, number_density)      # Radiative capture
+    def has_reaction(self, element: str, mt: int) -> bool:
+        """
+        Whether the data file of an element has the reaction mt.
+        The answer is cached, so checking a missing reaction (e.g. fission
+        in Pb208) does not go through the file or an exception again.
+        """
+        key = (element, mt)
+        if key not in self._has_mt:
+            self._has_mt[key] = _reaction_path(element, mt) in self._get_file(element)
+        return self._has_mt[key]
 
-        try:
-            # Try to get fission, default to 0 if not found (lazy load will fail if file missing)
-            # However, for generic handling, we wrap the specific call
-            Sigma_f = self.get_macroscopic_xs(element, 18, energy, number_density)   # Fission
-        except (RuntimeError, KeyError):
+    def _build_xs_arrays(self, element: str):
+        """
+        Pack _REACTIONS of one element onto the element's evaluated energy grid,
+        which every reaction shares from its threshold on.
+        A reaction missing from the file (e.g. fission in Pb208) gets an empty energy range.
+        """
+        entries = {}
+        for mt in _REACTIONS:
             # If the MT 18 doesn't exist in the file, we assume 0 fission
-            Sigma_f = 0.0
+            if mt == 18 and not self.has_reaction(element, mt):
+                continue
+            entries[mt] = self._cache[(element, mt)] if (element, mt) in self._cache else self._load(element, mt)
+
+        # The reaction with the lowest threshold carries the full grid
+        grid, _, grid_index, logE0, inv_dlog = max(entries.values(), key=lambda entry: len(entry[0]))
+        xs = np.zeros((len(_REACTIONS), len(grid)), dtype=np.float32)
+        E_range = np.tile(np.array([1.0, 0.0]), (len(_REACTIONS), 1))
+
+        for r, mt in enumerate(_REACTIONS):
+            if mt not in entries:
+                continue
+            reaction_grid, reaction_xs = entries[mt][:2]
+            offset = len(grid) - len(reaction_grid)
+            if not np.array_equal(grid[offset:], reaction_grid):
+                raise RuntimeError(f"Reaction MT {mt} of {element} is not on the element energy grid.")
+            xs[r, offset:] = reaction_xs
+            E_range[r] = (reaction_grid[0], reaction_grid[-1])
+
+        arrays = (grid, xs, grid_index, logE0, inv_dlog, E_range)
+        self._xs_arrays[element] = arrays
+        return arrays
+
+    def get_xs_arrays(self, element: str):
+        """
+        Packed (grid, xs[3, n], grid_index, logE0, inv_dlog, E_range[3, 2]) of
+        _REACTIONS for one element, for use inside JIT kernels.
+        """
+        if element in self._xs_arrays:
+            return self._xs_arrays[element]
+        return self._build_xs_arrays(element)
+
+    def build_material_tables(self, element: str, number_density: float):
+        """
+        Precompute the macroscopic (Sigma_s, Sigma_a, Sigma_f) of one material
+        on the union of the evaluated energy grids of its reactions, with a
+        log-energy index, so a tracking step needs a single grid search.
+        Every reaction is linear between union points, so interpolating the
+        table reproduces the per-reaction lookups.
+        Scattering is tabulated at the CM energy of a target at rest, as
+        get_cross_sections does above the thermal range, so the tables apply
+        for E >= 10 eV.
+        Returns (grid[n], sigma[n, 3], grid_index, logE0, inv_dlog); sigma is float32.
+        """
+        key = (element, number_density)
+        if key in self._material_tables:
+            return self._material_tables[key]
+
+        # Loads the reactions and records which ones the file lacks
+        self.get_xs_arrays(element)
+        cm_ratio = (_SCATTER_A / (_SCATTER_A + 1))**2
+
+        # Scattering breakpoints mapped back from CM to lab energies
+        reaction_grids = {
+            mt: self._cache[(element, mt)][0] / (cm_ratio if mt == 2 else 1.0)
+            for mt in _REACTIONS if (element, mt) in self._cache
+        }
+        grid = np.unique(np.concatenate(list(reaction_grids.values())))
+
+        sigma = np.zeros((len(grid), 3))
+        for r, mt in enumerate(_REACTIONS):
+            if mt not in reaction_grids:
+                continue
+            reaction_grid, xs = self._cache[(element, mt)][:2]
+            E = grid * cm_ratio if mt == 2 else grid
+            sigma[:, r] = _xs_lookup_array(reaction_grid, xs, E) * 1e-24 * number_density
+
+        grid_index, logE0, inv_dlog = _log_grid_index(grid, self.n_buckets)
+        tables = (grid, sigma.astype(np.float32), grid_index, logE0, inv_dlog)
+        self._material_tables[key] = tables
+        return tables
+
+    def get_cross_sections(self, element, energy, sampler, number_density):
+        """
+        Get energy-dependent macroscopic cross sections for a given element and energy.
+        Returns (Sigma_s, Sigma_a, Sigma_f, Sigma_t).
+        """
+        if number_density < 0:
+            raise ValueError("Number density cannot be negative")
 
-        Sigma_t = Sigma_s + Sigma_a + Sigma_f
+        # Scattering is looked up at the CM energy
+        energy_cm = calculate_E_cm_prime(energy, _SCATTER_A, sampler)
 
-        return Sigma_s, Sigma_a, Sigma_f, Sigma_t
+        return _macroscopic_xs_kernel(self.get_xs_arrays(element), energy, energy_cm, number_density)
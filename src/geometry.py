@@ -1,4 +1,5 @@
 # geometry.py
+import math
 import numpy as np
 from .medium import Region
 
@@ -7,7 +8,7 @@ def calculate_direction_cosines(x, y, z, x_prev, y_prev, z_prev):
     delta_x = x - x_prev
     delta_y = y - y_prev
     delta_z = z - z_prev
-    delta_s = np.sqrt(delta_x**2 + delta_y**2 + delta_z**2)
+    delta_s = math.sqrt(delta_x**2 + delta_y**2 + delta_z**2)
     return delta_x / delta_s, delta_y / delta_s, delta_z / delta_s
 
 def count_coordinates_in_boundary(coordinates, x_bounds, y_bounds, z_bounds):
@@ -15,7 +16,8 @@ def count_coordinates_in_boundary(coordinates, x_bounds, y_bounds, z_bounds):
     Counts the number of coordinates within the specified boundaries.
 
     Args:
-        coordinates (list of tuples): List of (x, y, z) coordinate tuples.
+        coordinates (np.ndarray or list of tuples): (N, 3) array of x, y, z
+            coordinates; a list of (x, y, z) tuples is converted to one.
         x_bounds (tuple): Min and max values for the x-coordinate.
         y_bounds (tuple): Min and max values for the y-coordinate.
         z_bounds (tuple): Min and max values for the z-coordinate.
@@ -23,12 +25,17 @@ def count_coordinates_in_boundary(coordinates, x_bounds, y_bounds, z_bounds):
     Returns:
         int: Number of coordinates within the specified boundaries.
     """
-    return sum(
-        x_bounds[0] <= x <= x_bounds[1] and
-        y_bounds[0] <= y <= y_bounds[1] and
-        z_bounds[0] <= z <= z_bounds[1]
-        for x, y, z in coordinates
+    coords = np.asarray(coordinates, dtype=np.float64)
+    if coords.size == 0:
+        return 0
+
+    x, y, z = coords[:, 0], coords[:, 1], coords[:, 2]
+    inside = (
+        (x >= x_bounds[0]) & (x <= x_bounds[1]) &
+        (y >= y_bounds[0]) & (y <= y_bounds[1]) &
+        (z >= z_bounds[0]) & (z <= z_bounds[1])
     )
+    return int(np.count_nonzero(inside))
 
 def get_primitive_surfaces(surface_list):
     """
@@ -56,9 +63,20 @@ def calculate_nearest_boundary(state, regions, u, v, w):
     # Iterate over all regions provided (Global, Local, etc.)
     for region in regions:
 
+        # Specialized regions (see Region._build_intersector): the intersection
+        # lies on the region boundary by construction, so no CSG check is needed.
+        if region._intersect is not None:
+            distance = region._intersect(x, y, z, u, v, w)
+            if distance < nearest_distance:
+                nearest_distance = distance
+                nearest_point = (x + distance * u, y + distance * v, z + distance * w)
+                nearest_region = region
+            continue
+
         # FIX 1: Flatten the surfaces to handle nested CSG regions
         # If 'region' is a Union of two Boxes, this gets the Planes of those Boxes.
-        primitives = get_primitive_surfaces(region.surfaces)
+        # The flattened tuple is cached on the region.
+        primitives = region.primitives()
 
         for surface in primitives:
             # Solve for distance
@@ -74,8 +92,9 @@ def calculate_nearest_boundary(state, regions, u, v, w):
                     candidate_point = (x + distance * u, y + distance * v, z + distance * w)
 
                     # Verify the point actually belongs to the region
-                    # (Necessary for CSG operations like Intersection/Difference)
-                    if region.contains(*candidate_point):
+                    # (Necessary for CSG operations like Intersection/Difference,
+                    # trivially true on the surface of a single primitive)
+                    if region._single_primitive or region.contains(*candidate_point):
 
                         nearest_distance = distance
                         nearest_point = candidate_point
@@ -0,0 +1,18 @@
+# src/jit.py
+"""
+Numba is optional: when it is not installed the kernels decorated with
+njit run as plain Python and prange falls back to range.
+"""
+try:
+    from numba import njit, prange
+except ImportError:
+    prange = range
+
+    def njit(*args, **kwargs):
+        # Support both @njit and @njit(cache=True, ...)
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func):
+            return func
+        return decorator
@@ -1,6 +1,53 @@
 # medium.py
 import numpy as np
 import math
+from .jit import njit
+
+
+@njit(cache=True)
+def _sphere_distance(x, y, z, u, v, w, x0, y0, z0, R2):
+    """
+    Compiled distance to a sphere of squared radius R2 centred at (x0, y0, z0).
+    Mirrors Sphere.nearest_surface_method, returning inf instead of None.
+    """
+    dir_norm = math.sqrt(u * u + v * v + w * w)
+    if dir_norm == 0:
+        return np.inf
+
+    x_bar = x - x0
+    y_bar = y - y0
+    z_bar = z - z0
+
+    b = (x_bar * u + y_bar * v + z_bar * w) / dir_norm
+    c = x_bar * x_bar + y_bar * y_bar + z_bar * z_bar - R2
+
+    disc = b * b - c
+    if disc < 0:
+        return np.inf
+
+    sqrt_d = math.sqrt(disc)
+    d1 = -b - sqrt_d
+    d2 = -b + sqrt_d
+
+    if c < 0:
+        return d2
+    if d1 >= 0:
+        return d1
+    return d2 if d2 >= 0 else np.inf
+
+
+def _make_sphere_intersector(x0, y0, z0, radius):
+    """
+    Distance function for a single sphere, bound to its parameters.
+    All spheres share the one compiled _sphere_distance.
+    """
+    R2 = radius * radius
+
+    def intersect(x, y, z, u, v, w):
+        return _sphere_distance(x, y, z, u, v, w, x0, y0, z0, R2)
+
+    return intersect
+
 
 class Region:
     def __init__(self, surfaces=None, operation="intersection", name=None, priority=0, is_void=False, element=None):
@@ -13,13 +60,48 @@ class Region:
         :param is_void: Whether the region is a void (no material interaction).
         :param element: The material element associated with the region.
         """
-        self.surfaces = surfaces if surfaces else []
+        # Specialized distance function, see _build_intersector()
+        self._intersect = None
+        self._primitives_cache = None
         self.operation = operation
+        self.surfaces = surfaces if surfaces else []
         self.name = name
         self.priority = priority
         self.is_void = is_void
         self.element = element
 
+    @property
+    def surfaces(self):
+        return self._surfaces
+
+    @surfaces.setter
+    def surfaces(self, surfaces):
+        self._surfaces = surfaces
+        self._invalidate_caches()
+
+    def __getstate__(self):
+        # The specialized distance function is a closure and does not pickle;
+        # it is rebuilt on unpickling
+        state = self.__dict__.copy()
+        state["_intersect"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._intersect = self._build_intersector()
+
+    def _invalidate_caches(self):
+        """Drop everything derived from the surface list."""
+        self._primitives_cache = None
+        self._intersect = self._build_intersector()
+        # A point on the lone primitive of an intersection/union region is in
+        # the region, so boundary searches can skip contains()
+        self._single_primitive = (
+            len(self._surfaces) == 1
+            and not isinstance(self._surfaces[0], Region)
+            and self.operation in ("intersection", "union")
+        )
+
     def contains(self, x, y, z, tolerance=1e-9):
             evaluations = []
             for surface in self.surfaces:
@@ -51,6 +133,38 @@ class Region:
     def add_surface(self, surface):
         """Add a surface to the region."""
         self.surfaces.append(surface)
+        self._invalidate_caches()
+
+    def primitives(self):
+        """
+        Flat tuple of the geometric surfaces (Planes, Spheres, etc.) of this
+        region, including those of nested Regions. Computed once and cached,
+        since the region topology is static during a simulation.
+        Note: modifying a nested Region does not invalidate its parents.
+        """
+        if self._primitives_cache is None:
+            primitives = []
+            for surface in self.surfaces:
+                if isinstance(surface, Region):
+                    primitives.extend(surface.primitives())
+                else:
+                    primitives.append(surface)
+            self._primitives_cache = tuple(primitives)
+        return self._primitives_cache
+
+    def _build_intersector(self):
+        """
+        Specialize the boundary search for simple regions.
+        A region made of a single Sphere gets a compiled closed-form distance
+        function, used by calculate_nearest_boundary instead of the generic
+        CSG path. Returns the function, or None if the region is not simple.
+        Note: like primitives(), it is not rebuilt if the Sphere itself is modified.
+        """
+        if (len(self._surfaces) == 1 and isinstance(self._surfaces[0], Sphere)
+                and self.operation in ("intersection", "union")):
+            sphere = self._surfaces[0]
+            return _make_sphere_intersector(sphere.x0, sphere.y0, sphere.z0, sphere.radius)
+        return None
 
 
 
@@ -74,8 +188,9 @@ class Plane:
         numerator = -self.D - self.A*x - self.B*y - self.C*z
         denominator = self.A*u + self.B*v + self.C*w
 
-        if np.isclose(numerator, 0, atol=1e-8):
-            return 0.0 if not np.isclose(denominator, 0) else None
+        # Plain comparisons: np.isclose is costly on scalars in this hot path
+        if abs(numerator) <= 1e-8:
+            return 0.0 if not abs(denominator) <= 1e-8 else None
 
         if denominator == 0:
             return None
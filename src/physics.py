@@ -1,38 +1,40 @@
 # src/physics.py
+import math
 import numpy as np
+from .jit import njit
 
 # Constants
 m_n = 1.674927471e-27  # Neutron mass in kg
 eV_to_J = 1.60217663e-19 # Conversion factor
 
+# Speed/energy conversion factors: v = sqrt(_V_FACTOR * E), E = _INV_FACTOR * v^2
+_V_FACTOR = 2 * eV_to_J / m_n
+_INV_FACTOR = m_n / (2 * eV_to_J)
+
+# Reaction codes returned by sample_collision
+SCATTER, CAPTURE, FISSION = 0, 1, 2
+
+@njit(cache=True, fastmath=True)
 def calculate_mu_lab(mu_cm, E, E_prime, E_cm_prime, A):
     """
     Matches OpenMC Eq :label: angle-com-to-lab
     """
     if E_prime <= 0: return 0.0
 
-    term1 = mu_cm * np.sqrt(E_cm_prime / E_prime)
-    term2 = (1 / (A + 1)) * np.sqrt(E / E_prime)
+    term1 = mu_cm * math.sqrt(E_cm_prime / E_prime)
+    term2 = (1 / (A + 1)) * math.sqrt(E / E_prime)
     mu_lab = term1 + term2
 
     # Clamp to [-1, 1] for numerical stability
     return max(-1.0, min(1.0, mu_lab))
 
-def calculate_E_cm_prime(initial_energy, A, sampler):
+@njit(cache=True, fastmath=True)
+def _E_cm_prime_kernel(E, A, v_t):
     """
-    Calculates Center-of-Mass energy.
-    Partially matches OpenMC 'Elastic Scattering' section,
-    but simplifies vector math to scalars for thermal approximation.
+    Scalar kernel of calculate_E_cm_prime for a sampled target speed v_t.
     """
-    E = initial_energy
-
-    # Unit Conversion
-    E_joules = E * eV_to_J
-    v_l = np.sqrt(2 * E_joules / m_n)
-
-    # Sample target velocity (Free Gas approximation)
-    # OpenMC uses 400kT threshold (approx 10 eV is fine)
-    v_t = sampler.sample_velocity(vn=v_l) if E < 10 else 0.0
+    # Neutron speed: v = sqrt(2 E / m_n)
+    v_l = math.sqrt(_V_FACTOR * E)
 
     # Calculate CM velocity (Scalar approximation of OpenMC vector Eq :label: velocity-com)
     # v_cm = (v_n + A*v_t) / (A+1)
@@ -42,14 +44,37 @@ def calculate_E_cm_prime(initial_energy, A, sampler):
     # OpenMC Eq :label: velocity-neutron-com
     v_l_cm = abs(v_l - v_cm)
 
-    # Calculate E_cm_prime
+    # Calculate E_cm_prime in eV
     # E = 0.5 * m * v^2
-    E_cm_prime_joules = 0.5 * m_n * v_l_cm**2
+    return _INV_FACTOR * v_l_cm * v_l_cm
 
-    # Convert back to eV
-    E_cm_prime = E_cm_prime_joules / eV_to_J
+def calculate_E_cm_prime(initial_energy, A, sampler):
+    """
+    Calculates Center-of-Mass energy.
+    Partially matches OpenMC 'Elastic Scattering' section,
+    but simplifies vector math to scalars for thermal approximation.
+    """
+    E = initial_energy
+
+    # Sample target velocity (Free Gas approximation)
+    # OpenMC uses 400kT threshold (approx 10 eV is fine)
+    if E < 10:
+        v_l = math.sqrt(_V_FACTOR * E)
+        v_t = sampler.sample_velocity(vn=v_l)
+    else:
+        v_t = 0.0
 
-    return E_cm_prime
+    return _E_cm_prime_kernel(E, A, v_t)
+
+@njit(cache=True, fastmath=True)
+def _E_prime_kernel(E_cm_prime, E, A, mu_cm):
+    """
+    Scalar kernel of calculate_E_prime for a sampled mu_cm.
+    """
+    # OpenMC Formula
+    inv_Ap1 = 1.0 / (A + 1)
+    numerator = E * inv_Ap1 + 2 * mu_cm * math.sqrt(E * E_cm_prime)
+    return E_cm_prime + numerator * inv_Ap1
 
 def calculate_E_prime(E_cm_prime, initial_energy, A, rng):
     """
@@ -63,44 +88,151 @@ def calculate_E_prime(E_cm_prime, initial_energy, A, rng):
     except:
         mu_cm = 2 * rng.uniform(0, 1) - 1
 
-    # OpenMC Formula
-    numerator = E + 2 * mu_cm * (A + 1) * np.sqrt(E * E_cm_prime)
-    term2 = numerator / ((A + 1)**2)
-    E_prime = E_cm_prime + term2
+    E_prime = _E_prime_kernel(E_cm_prime, E, A, mu_cm)
 
     return E_prime, mu_cm
 
-def elastic_scattering(initial_energy, A, sampler, rng):
-    E_cm_prime = calculate_E_cm_prime(initial_energy, A, sampler)
-    E_prime, mu_cm = calculate_E_prime(E_cm_prime, initial_energy, A, rng)
+@njit(cache=True, fastmath=True)
+def _elastic_kernel(E, E_cm_prime, A, mu_cm):
+    """
+    Scalar kernel of elastic_scattering for a sampled mu_cm.
+    Returns (E_prime, mu_lab).
+    """
+    E_prime = _E_prime_kernel(E_cm_prime, E, A, mu_cm)
 
     # Safety clamp
     E_prime = max(1e-5, E_prime)
 
-    mu_lab = calculate_mu_lab(mu_cm, initial_energy, E_prime, E_cm_prime, A)
+    mu_lab = calculate_mu_lab(mu_cm, E, E_prime, E_cm_prime, A)
+    return E_prime, mu_lab
+
+def elastic_scattering(initial_energy, A, sampler, rng):
+    E_cm_prime = calculate_E_cm_prime(initial_energy, A, sampler)
+    try:
+        mu_cm = 2 * rng.random() - 1
+    except:
+        mu_cm = 2 * rng.uniform(0, 1) - 1
+
+    E_prime, mu_lab = _elastic_kernel(initial_energy, E_cm_prime, A, mu_cm)
     return E_prime, mu_cm, mu_lab
 
-def sample_new_direction_cosines(u, v, w, mu_lab, rng):
+@njit(cache=True)
+def _grid_search(grid, grid_index, logE0, inv_dlog, energy):
     """
-    Matches OpenMC Eq :label: post-collision-angle
-    Includes singularity check for w ~ 1.
-    """
-    phi = 2 * np.pi * rng.random()
-    sin_theta = np.sqrt(max(0.0, 1.0 - mu_lab**2))
-
-    # Check for singularity (particle moving parallel to z-axis)
-    # This prevents division by zero in the standard rotation matrix
-    if abs(w) >= 0.999999:
-        sign = 1.0 if w > 0 else -1.0
-        u_new = sin_theta * np.cos(phi)
-        v_new = sin_theta * np.sin(phi)
-        w_new = sign * mu_lab
+    Index i with grid[i] <= energy < grid[i + 1], clamped to [0, len(grid) - 2].
+    The uniform log-energy bucket of energy gives the range of grid points
+    to bisect (see _log_grid_index in cross_section_read).
+    """
+    n = len(grid)
+    k = int((math.log(energy) - logE0) * inv_dlog)
+    k = min(max(k, 0), len(grid_index) - 2)
+    lo = grid_index[k]
+    hi = grid_index[k + 1] + 1
+
+    # Rounding of the bucket at its edges
+    if grid[lo] > energy:
+        lo = 0
+    if hi > n - 1 or grid[hi] <= energy:
+        hi = n - 1
+
+    while hi - lo > 1:
+        mid = (lo + hi) >> 1
+        if grid[mid] <= energy:
+            lo = mid
+        else:
+            hi = mid
+    return lo
+
+@njit(cache=True)
+def _grid_interp(grid, values, i, energy):
+    """
+    Linear interpolation of values between grid[i] and grid[i + 1].
+    Tables are stored in float32; the result is always a float64.
+    """
+    E0 = grid[i]
+    E1 = grid[i + 1]
+    y0 = float(values[i])
+    y1 = float(values[i + 1])
+    if E1 <= E0:
+        return y1
+    return y0 + (y1 - y0) * ((energy - E0) / (E1 - E0))
+
+@njit(cache=True)
+def _material_lookup(tables, energy):
+    """
+    Interpolate the tables of CrossSectionReader.build_material_tables at one energy.
+    Returns (Sigma_t, P(scatter), P(scatter or capture)).
+    Energies outside the grid clamp to its ends.
+    """
+    grid, sigma, grid_index, logE0, inv_dlog = tables
+    energy = min(max(energy, grid[0]), grid[-1])
+    i = _grid_search(grid, grid_index, logE0, inv_dlog, energy)
+
+    Sigma_s = _grid_interp(grid, sigma[:, 0], i, energy)
+    Sigma_a = _grid_interp(grid, sigma[:, 1], i, energy)
+    Sigma_f = _grid_interp(grid, sigma[:, 2], i, energy)
+    Sigma_t = Sigma_s + Sigma_a + Sigma_f
+
+    # Where there is no interaction at all, treat a collision as scattering
+    if Sigma_t <= 0:
+        return 0.0, 1.0, 1.0
+    return Sigma_t, Sigma_s / Sigma_t, (Sigma_s + Sigma_a) / Sigma_t
+
+@njit(cache=True, fastmath=True)
+def sample_collision(E, xi_reaction, xi_mu, tables, A):
+    """
+    Fused lookup and collision kernel above the thermal range, on the tables
+    of CrossSectionReader.build_material_tables.
+    A single grid search gives Sigma_t and the cumulative reaction
+    probabilities at E; xi_reaction then selects the reaction and xi_mu the
+    CM cosine of the elastic scatter (target at rest).
+    Returns (Sigma_t, p_scatter, reaction, E_prime, mu_lab).
+    """
+    Sigma_t, p_s, p_sa = _material_lookup(tables, E)
+
+    if xi_reaction < p_s:
+        reaction = SCATTER
+    elif xi_reaction < p_sa:
+        reaction = CAPTURE
     else:
-        denom = np.sqrt(max(1e-12, 1.0 - w**2))
-        u_new = (mu_lab * u) + (sin_theta / denom) * (u * w * np.cos(phi) - v * np.sin(phi))
-        v_new = (mu_lab * v) + (sin_theta / denom) * (v * w * np.cos(phi) + u * np.sin(phi))
-        w_new = (mu_lab * w) - (sin_theta * denom * np.cos(phi))
+        reaction = FISSION
+
+    E_prime, mu_lab = _elastic_kernel(E, _E_cm_prime_kernel(E, A, 0.0), A, 2 * xi_mu - 1)
+    return Sigma_t, p_s, reaction, E_prime, mu_lab
+
+@njit(cache=True, fastmath=True)
+def _rotate_direction(u, v, w, mu_lab, phi):
+    """
+    Scalar kernel of sample_new_direction_cosines for a sampled azimuth phi.
+    Returns the normalized (u, v, w) after scattering through mu_lab.
+    """
+    sin_theta = math.sqrt(max(0.0, 1.0 - mu_lab**2))
+    cos_phi = math.cos(phi)
+    sin_phi = math.sin(phi)
+
+    # Unit vector of the incident direction projected on the xy-plane.
+    # Branchless at the pole (particle moving parallel to z-axis): the
+    # projection is blended to (1, 0) instead of dividing by zero, which
+    # gives the usual polar rotation.
+    denom = math.sqrt(u * u + v * v)
+    pole = 1.0 if denom < 1e-12 else 0.0  # select, compiles to a blend
+    inv_denom = (1.0 - pole) / max(denom, 1e-300)
+    cx = u * inv_denom + pole
+    cy = v * inv_denom
+
+    u_new = (mu_lab * u) + sin_theta * (cx * w * cos_phi - cy * sin_phi)
+    v_new = (mu_lab * v) + sin_theta * (cy * w * cos_phi + cx * sin_phi)
+    w_new = (mu_lab * w) - (sin_theta * denom * cos_phi)
 
     # Normalize
-    norm = np.sqrt(u_new**2 + v_new**2 + w_new**2)
-    return u_new/norm, v_new/norm, w_new/norm, phi
+    norm = math.sqrt(u_new * u_new + v_new * v_new + w_new * w_new)
+    return u_new / norm, v_new / norm, w_new / norm
+
+def sample_new_direction_cosines(u, v, w, mu_lab, rng):
+    """
+    Matches OpenMC Eq :label: post-collision-angle
+    Well defined for w = ±1 without a separate polar branch.
+    """
+    phi = 2 * math.pi * rng.random()
+    u_new, v_new, w_new = _rotate_direction(u, v, w, mu_lab, phi)
+    return u_new, v_new, w_new, phi
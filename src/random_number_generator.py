@@ -1,25 +1,47 @@
 import numpy as np
 
 class RNGHandler:
-    def __init__(self, seed=None):
+    def __init__(self, seed=None, batch_size=64):
         """
         Initialize the RNGHandler with an optional seed.
+        seed may be an int or a np.random.SeedSequence, e.g. one of
+        SeedSequence(entropy).spawn(n) for independent per-particle streams.
+        Uniform draws are generated batch_size at a time.
         """
         self.rng = np.random.default_rng(seed)
+        self.batch_size = batch_size
+        self._buffer = []
+        self._batch_state = None  # Bit generator state before the current batch
 
     def random(self):
         """Generate a random float in [0, 1)."""
-        return self.rng.random()
+        if not self._buffer:
+            self._batch_state = self.rng.bit_generator.state
+            # Reversed so that pop() hands the draws out in generation order
+            self._buffer = self.rng.random(self.batch_size)[::-1].tolist()
+        return self._buffer.pop()
+
+    def _sync(self):
+        """
+        Rewind the generator to just after the draws handed out so far and
+        drop the rest of the batch, so direct use of self.rng continues the
+        same stream. Each float64 draw consumes one PCG64 output.
+        """
+        if self._buffer:
+            used = self.batch_size - len(self._buffer)
+            self.rng.bit_generator.state = self._batch_state
+            self.rng.bit_generator.advance(used)
+            self._buffer = []
 
     def uniform(self, low, high):
         """Generate a random float in the range [low, high)."""
-        return self.rng.uniform(low, high)
+        return low + (high - low) * self.random()
 
     def log_uniform(self, scale):
         """Generate a random float for exponential distribution."""
-        return -np.log(1 - self.rng.random()) / scale
+        return -np.log(1 - self.random()) / scale
 
     def choice(self, a, size=None, replace=True, p=None):
         """Generate random choices from a sequence."""
+        self._sync()
         return self.rng.choice(a, size=size, replace=replace, p=p)
-
@@ -1,8 +1,23 @@
 # src/simulation.py
 from .geometry import calculate_nearest_boundary, calculate_void_si_max
 from .physics import elastic_scattering, sample_new_direction_cosines
+from .random_number_generator import RNGHandler
+import math
 import numpy as np
 
+# Particle result codes
+ALIVE, ESCAPED, KILLED, ABSORBED = 0, 1, 2, 3
+RESULT_CODES = {"escaped": ESCAPED, "killed": KILLED, "absorbed": ABSORBED}
+
+# Fixed per-particle record returned by simulate_particle_chunk
+RESULT_DT = np.dtype([
+    ("code", "i1"),        # Result code
+    ("E", "f8"),           # Final energy (eV)
+    ("w", "f8"),           # Final weight
+    ("absorbed_w", "f8"),  # Weight absorbed along the history
+    ("detected", "?"),     # Entered region_bounds
+])
+
 def simulate_single_particle(args):
     """
     Simulates a single particle and returns partial tally results.
@@ -27,6 +42,33 @@ def simulate_single_particle(args):
         "trajectory": trajectory if track_coordinates else None,
     }
 
+def simulate_particle_chunk(args):
+    """
+    Simulates a chunk of particles in one worker and returns compact results
+    (records, absorbed_events, trajectories):
+    records is a RESULT_DT array with one entry per particle, absorbed_events a
+    (K, 4) array of (x, y, z, weight) absorption events, and trajectories the
+    list of per-particle trajectories (None unless track_coordinates).
+    Each particle's RNGHandler is built from its SeedSequence in seed_seqs.
+    """
+    states, reader, mediums, A, N, sampler, region_bounds, track_coordinates, seed_seqs, settings = args
+
+    records = np.empty(len(states), dtype=RESULT_DT)
+    absorbed_events = []
+    trajectories = [] if track_coordinates else None
+
+    for i, (state, seed_seq) in enumerate(zip(states, seed_seqs)):
+        result, absorbed_coords, _, _, final_energy, region_count, trajectory, total_absorbed_weight = simulate_particle(
+            state, reader, mediums, A, N, sampler, region_bounds,
+            track_coordinates=track_coordinates, rng=RNGHandler(seed_seq), settings=settings
+        )
+        records[i] = (RESULT_CODES[result], final_energy, state["weight"], total_absorbed_weight, region_count > 0)
+        absorbed_events.extend(absorbed_coords)
+        if track_coordinates:
+            trajectories.append(trajectory)
+
+    return records, np.array(absorbed_events, dtype=np.float64).reshape(-1, 4), trajectories
+
 def simulate_particle(state, reader, mediums, A, N, sampler, region_bounds=None, track_coordinates=False, rng=None, settings=None):
     """
     Simulate the trajectory of a single particle.
@@ -42,9 +84,11 @@ def simulate_particle(state, reader, mediums, A, N, sampler, region_bounds=None,
 
     # Geometry State Initialization
     x_prev, y_prev, z_prev = state["x"], state["y"], state["z"]
-    u = np.sin(state["theta"]) * np.cos(state["phi"])
-    v = np.sin(state["theta"]) * np.sin(state["phi"])
-    w = np.cos(state["theta"])
+    # Scalar math: the math module is much cheaper than NumPy on single floats
+    sin_theta = math.sin(state["theta"])
+    u = sin_theta * math.cos(state["phi"])
+    v = sin_theta * math.sin(state["phi"])
+    w = math.cos(state["theta"])
 
     while True:
         # 1. TRACKING
@@ -96,7 +140,7 @@ def simulate_particle(state, reader, mediums, A, N, sampler, region_bounds=None,
         if Sigma_t <= 0:
             si = float('inf')
         else:
-            si = -np.log(1 - rng.random()) / Sigma_t
+            si = -math.log(1 - rng.random()) / Sigma_t
 
         # 8. MOVE PARTICLE
         if si > nearest_distance:
@@ -177,5 +221,5 @@ def simulate_particle(state, reader, mediums, A, N, sampler, region_bounds=None,
 
         # FIX: Update Global Theta using the new z-direction cosine (w)
         # Using np.arccos(mu_lab) was incorrect (resetting to relative scattering angle)
-        state["theta"] = np.arccos(w)
+        state["theta"] = math.acos(max(-1.0, min(1.0, w)))
         state["energy"] = E_prime
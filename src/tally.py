@@ -1,11 +1,20 @@
 # src/tally.py
+import math
 import numpy as np
+from .simulation import ESCAPED, KILLED
 
 class Tally:
     def __init__(self):
         self.results = {"absorbed": 0.0, "escaped": 0, "killed": 0}
         self.absorbed_coordinates = []
+        self.absorption_events = 0
+        # Per-particle final energies of update() and merge_partial_results()
         self.energy_spectrum = []
+        # Chunk results only keep the sum and count of final energies: one
+        # partial sum per chunk, combined with math.fsum for the average.
+        # Chunk merges do not fill energy_spectrum.
+        self.energy_sums = []
+        self.energy_count = 0
         self.region_count = 0  # Tracks particles detected in a specific region
 
     def update(self, result, absorbed_weight=0.0, absorbed_coords=None, final_energy=None, region_detected=False):
@@ -19,6 +28,7 @@ class Tally:
         # Track absorbed coordinates
         if absorbed_coords:
             self.absorbed_coordinates.extend(absorbed_coords)
+            self.absorption_events += len(absorbed_coords)
 
         # Track energy spectrum
         if final_energy is not None:
@@ -41,6 +51,7 @@ class Tally:
 
             if partial_results["absorbed_coords"]:
                 self.absorbed_coordinates.extend(partial_results["absorbed_coords"])
+                self.absorption_events += len(partial_results["absorbed_coords"])
 
             if partial_results["final_energy"] is not None:
                 self.energy_spectrum.append(partial_results["final_energy"])
@@ -50,6 +61,27 @@ class Tally:
 
 
 
+    def merge_chunk_results(self, records, absorbed_events, keep_coordinates=True):
+            """
+            Merge the RESULT_DT records and (K, 4) absorption events of a
+            worker chunk (see simulate_particle_chunk).
+            Final energies go to energy_sums/energy_count, not energy_spectrum.
+            Callers that score the events themselves (e.g. into a mesh) pass
+            keep_coordinates=False so they are counted but not stored.
+            """
+            codes = records["code"]
+            self.results["escaped"] += int(np.count_nonzero(codes == ESCAPED))
+            self.results["killed"] += int(np.count_nonzero(codes == KILLED))
+
+            self.results["absorbed"] += float(records["absorbed_w"].sum())
+
+            if keep_coordinates:
+                self.absorbed_coordinates.extend(map(tuple, absorbed_events.tolist()))
+            self.absorption_events += len(absorbed_events)
+            self.energy_sums.append(float(records["E"].sum()))
+            self.energy_count += len(records)
+            self.region_count += int(np.count_nonzero(records["detected"]))
+
     def print_summary(self, num_particles):
             # Print a summary of results
             print(f"--- Simulation Results ---")
@@ -58,21 +90,31 @@ class Tally:
             print(f"  Particles Killed (Roulette): {self.results['killed']}")
             print(f"  Total Weight Absorbed:   {self.results['absorbed']:.4f}")
 
-            # Use the correct attribute name here:
-            print(f"  Total Absorption Events Recorded: {len(self.absorbed_coordinates)}")
+            print(f"  Total Absorption Events Recorded: {self.absorption_events}")
 
             print(f"  Detected within detection region (if specified): {self.region_count}")
 
-            if self.energy_spectrum:
-                avg_energy = sum(self.energy_spectrum) / len(self.energy_spectrum)
+            avg_energy = self.average_energy()
+            if avg_energy is not None:
                 print(f"  Average final energy:    {avg_energy:.2e} eV")
             else:
                 print(f"  No particles left to calculate average final energy.")
 
+    def average_energy(self):
+        """Mean final energy over energy_spectrum and the chunk sums, or None if empty."""
+        n_energies = len(self.energy_spectrum) + self.energy_count
+        if not n_energies:
+            return None
+        return math.fsum(self.energy_spectrum + self.energy_sums) / n_energies
+
     def get_results(self):
         return {
             "results": self.results,
-            "absorbed_events": self.absorbed_events,
+            "absorbed_coordinates": self.absorbed_coordinates,
+            "absorption_events": self.absorption_events,
             "energy_spectrum": self.energy_spectrum,
+            "energy_sum": math.fsum(self.energy_sums),
+            "energy_count": self.energy_count,
+            "average_energy": self.average_energy(),
             "region_count": self.region_count,
         }
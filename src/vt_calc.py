@@ -1,4 +1,59 @@
 import numpy as np
+from .jit import njit
+
+
+@njit(cache=True)
+def _sample_from_2x3_exp_neg_x2_kernel():
+    """Samples x from the distribution 2x^3 * exp(-x^2)."""
+    while True:
+        x = np.random.uniform(0, 10)  # Choose an upper limit suitable for the problem
+        p = 2 * x**3 * np.exp(-x**2)
+        if np.random.uniform(0, 1) < p:
+            return x
+
+
+@njit(cache=True)
+def _sample_from_4pi_x2_exp_neg_x2_kernel():
+    """Samples x from the distribution 4πx^2 * exp(-x^2)."""
+    while True:
+        x = np.random.uniform(0, 10)  # Choose an upper limit suitable for the problem
+        p = 4 * x**2 * np.exp(-x**2)/np.sqrt(np.pi)
+        if np.random.uniform(0, 1) < p:
+            return x
+
+
+@njit(cache=True)
+def _sample_velocity_kernel(vn, beta, max_attempts):
+    """
+    Scalar kernel of VelocitySampler.sample_velocity for compiled transport loops.
+    Draws from Numba's generator, not NumPy's global one.
+    Returns -1.0 if no sample is accepted within max_attempts.
+    """
+    for attempt in range(max_attempts):
+        # Step 1: Sample from q(x)
+        xi1 = np.random.uniform(0, 1)
+        if xi1 < 2 / (np.sqrt(np.pi) * vn + 2):
+            # Sample from 2x^3 * exp(-x^2)
+            x = _sample_from_2x3_exp_neg_x2_kernel()
+        else:
+            # Sample from 4πx^2 * exp(-x^2)
+            x = _sample_from_4pi_x2_exp_neg_x2_kernel()
+
+        # Convert x to v_T
+        v_t = x / beta
+
+        # Sample mu
+        xi2 = np.random.uniform(0, 1)
+        mu = 2 * xi2 - 1
+
+        # Step 2: Acceptance criterion
+        xi3 = np.random.uniform(0, 1)
+        acceptance_prob = np.sqrt((vn**2 + v_t**2 - 2 * vn * v_t * mu)) / (vn + v_t)
+
+        if xi3 < acceptance_prob:
+            return v_t
+
+    return -1.0
 
 
 class VelocitySampler:
@@ -76,4 +131,3 @@ class VelocitySampler:
                 return v_t
 
         raise ValueError("Failed to find an accepted sample within the maximum attempts")
-
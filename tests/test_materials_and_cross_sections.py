@@ -1,4 +1,5 @@
 import pytest
+import os
 import numpy as np
 from src.material import Material
 from src.cross_section_read import CrossSectionReader
@@ -194,6 +195,148 @@ class TestCrossSectionReader:
                 energy=1e6
             )
 
+    @pytest.mark.skipif(
+        not os.path.exists("./endfb/neutron/Pb208.h5"),
+        reason="Requires ENDF/B HDF5 files"
+    )
+    def test_cross_section_cached(self, reader):
+        """Test that a reaction is read from HDF5 once and then served from memory"""
+        xs1 = reader.get_cross_section("Pb208", 2, 1e6)
+        assert ("Pb208", 2) in reader._cache
+
+        grid, xs, grid_index, logE0, inv_dlog = reader._cache[("Pb208", 2)]
+        assert len(grid_index) == reader.n_buckets + 1
+        assert grid.flags["C_CONTIGUOUS"] and xs.flags["C_CONTIGUOUS"]
+        E_max = grid[-1]
+
+        xs2 = reader.get_cross_section("Pb208", 2, 1e6)
+        assert xs1 == xs2
+
+        # Outside the tabulated range
+        assert reader.get_cross_section("Pb208", 2, E_max * 2) == 0.0
+
+    @pytest.mark.skipif(
+        not os.path.exists("./endfb/neutron/Pb208.h5"),
+        reason="Requires ENDF/B HDF5 files"
+    )
+    @pytest.mark.parametrize("mt", [2, 102])
+    def test_lookup_matches_evaluated_data(self, reader, mt):
+        """Test lookups against linear interpolation of the evaluated data, resonances included"""
+        import h5py
+
+        with h5py.File("./endfb/neutron/Pb208.h5", "r") as f:
+            grid = f["Pb208/energy/294K"][:]
+            xs = f[f"Pb208/reactions/reaction_{mt:03}/294K/xs"][:]
+
+        # Grid points, interval midpoints, and a dense sweep of the resolved resonances
+        energies = np.concatenate([
+            grid[1:-1],
+            0.5 * (grid[:-1] + grid[1:]),
+            np.logspace(3, 6, 5000),
+        ])
+        expected = np.interp(energies, grid, xs)
+        looked_up = np.array([reader.get_cross_section("Pb208", mt, E) for E in energies])
+
+        assert looked_up == pytest.approx(expected, rel=1e-6, abs=1e-12)
+
+    @pytest.mark.skipif(
+        not os.path.exists("./endfb/neutron/Pb208.h5"),
+        reason="Requires ENDF/B HDF5 files"
+    )
+    def test_cross_section_array_matches_scalar(self, reader):
+        """Test the vectorized lookup against the scalar lookup"""
+        energies = np.array([1e-6, 1.0, 1e3, 1e5, 1e6, 1e9])
+        xs_array = reader.get_cross_section_array("Pb208", 2, energies)
+        xs_scalar = [reader.get_cross_section("Pb208", 2, E) for E in energies]
+
+        assert xs_array == pytest.approx(xs_scalar, rel=1e-12)
+        assert xs_array[0] == 0.0 and xs_array[-1] == 0.0
+        # float64 with or without Numba, although the tables are float32
+        assert all(isinstance(xs, float) for xs in xs_scalar)
+
+    @pytest.mark.skipif(
+        not os.path.exists("./endfb/neutron/Pb208.h5"),
+        reason="Requires ENDF/B HDF5 files"
+    )
+    def test_get_cross_sections_matches_single_lookups(self, reader):
+        """Test the packed-table kernel against individual reaction lookups"""
+        mass = 208 * 1.674927471e-27
+        sampler = VelocitySampler(mass=mass, temperature=294)
+        N = 3.3e22
+        E = 1e6  # Above the thermal range, so the CM energy is deterministic
+
+        Sigma_s, Sigma_a, Sigma_f, Sigma_t = reader.get_cross_sections("Pb208", E, sampler, N)
+
+        E_cm = E * (2.5 / 3.5) ** 2
+        assert Sigma_s == pytest.approx(reader.get_macroscopic_xs("Pb208", 2, E_cm, N), rel=1e-9)
+        assert Sigma_a == pytest.approx(reader.get_macroscopic_xs("Pb208", 102, E, N), rel=1e-9)
+        assert Sigma_f == 0.0  # Pb208 has no fission data
+        assert Sigma_t == pytest.approx(Sigma_s + Sigma_a)
+
+    @pytest.mark.skipif(
+        not os.path.exists("./endfb/neutron/Pb208.h5"),
+        reason="Requires ENDF/B HDF5 files"
+    )
+    def test_material_tables_match_get_cross_sections(self, reader):
+        """Test the precomputed material tables against the per-reaction lookups"""
+        from src.physics import _material_lookup
+
+        sampler = VelocitySampler(mass=208 * 1.674927471e-27, temperature=294)
+        N = 3.3e22
+
+        tables = reader.build_material_tables("Pb208", N)
+        assert reader.build_material_tables("Pb208", N) is tables
+
+        # Resolved resonances of Pb208 sit between a few keV and ~1 MeV
+        for E in np.concatenate([np.logspace(3, 6, 2000), [2e6, 1e7]]):
+            Sigma_s, Sigma_a, _, Sigma_t = reader.get_cross_sections("Pb208", E, sampler, N)
+            Sigma_t_mat, p_s, p_sa = _material_lookup(tables, E)
+            assert Sigma_t_mat == pytest.approx(Sigma_t, rel=1e-5)
+            assert p_s == pytest.approx(Sigma_s / Sigma_t, rel=1e-5)
+            assert p_sa == pytest.approx((Sigma_s + Sigma_a) / Sigma_t, rel=1e-5)
+
+    @pytest.mark.skipif(
+        not os.path.exists("./endfb/neutron/Pb208.h5"),
+        reason="Requires ENDF/B HDF5 files"
+    )
+    def test_has_reaction_cached(self, reader):
+        """Test the per-reaction availability flag (Pb208 has no fission data)"""
+        assert reader.has_reaction("Pb208", 2)
+        assert not reader.has_reaction("Pb208", 18)
+        assert reader._has_mt[("Pb208", 18)] is False
+
+    @pytest.mark.skipif(
+        not os.path.exists("./endfb/neutron/Pb208.h5"),
+        reason="Requires ENDF/B HDF5 files"
+    )
+    def test_preload_fills_cache(self, reader):
+        """Test preloading skips missing reactions and packs the kernel tables"""
+        reader.preload(["Pb208"], mts=[2, 102, 18])
+        assert ("Pb208", 2) in reader._cache
+        assert ("Pb208", 102) in reader._cache
+        assert ("Pb208", 18) not in reader._cache
+        assert "Pb208" in reader._xs_arrays
+
+    @pytest.mark.skipif(
+        not os.path.exists("./endfb/neutron/Pb208.h5"),
+        reason="Requires ENDF/B HDF5 files"
+    )
+    def test_hdf5_handle_kept_open_and_picklable(self, reader):
+        """Test one HDF5 handle per element, which is dropped when pickling"""
+        import pickle
+
+        reader.get_cross_section("Pb208", 2, 1e6)
+        handle = reader._files["Pb208"]
+        reader.get_cross_section("Pb208", 102, 1e6)
+        assert reader._files["Pb208"] is handle
+
+        clone = pickle.loads(pickle.dumps(reader))
+        assert clone._files == {}
+        assert clone.get_cross_section("Pb208", 2, 1e6) == reader.get_cross_section("Pb208", 2, 1e6)
+
+        reader.close()
+        assert reader._files == {}
+
     def test_invalid_mt_number(self, reader):
         """Test invalid MT number raises error"""
         with pytest.raises(ValueError):
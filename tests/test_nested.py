@@ -1,6 +1,7 @@
 import pytest
-from src.medium import Region, Box
-from src.geometry import calculate_nearest_boundary
+import numpy as np
+from src.medium import Region, Box, Sphere
+from src.geometry import calculate_nearest_boundary, get_primitive_surfaces, count_coordinates_in_boundary
 
 def test_nested_region_crash():
     """
@@ -36,5 +37,34 @@ def test_nested_region_crash():
     # The returned medium should be the Wrapper (the region we passed in)
     assert medium.name == "Wrapper"
 
+def test_primitives_cached_on_region():
+    """
+    The flattened primitive list is computed once and rebuilt when surfaces change.
+    """
+    inner_box = Box(0, 10, 0, 10, 0, 10)
+    wrapper_region = Region(surfaces=[inner_box], operation="union", name="Wrapper")
+
+    primitives = wrapper_region.primitives()
+    assert list(primitives) == get_primitive_surfaces(wrapper_region.surfaces)
+    assert wrapper_region.primitives() is primitives
+
+    sphere = Sphere((0, 0, 0), 1.0)
+    wrapper_region.add_surface(sphere)
+    assert wrapper_region.primitives()[-1] is sphere
+    assert len(wrapper_region.primitives()) == 7
+
+    wrapper_region.surfaces = [sphere]
+    assert wrapper_region.primitives() == (sphere,)
+
+def test_count_coordinates_in_boundary():
+    """
+    Lists of tuples and (N, 3) arrays are counted the same way.
+    """
+    coords = [(0.5, 0.5, 0.5), (2.0, 0.5, 0.5), (1.0, 1.0, 1.0)]
+    bounds = (0, 1)
+    assert count_coordinates_in_boundary(coords, bounds, bounds, bounds) == 2
+    assert count_coordinates_in_boundary(np.array(coords), bounds, bounds, bounds) == 2
+    assert count_coordinates_in_boundary([], bounds, bounds, bounds) == 0
+
 if __name__ == "__main__":
     pytest.main([__file__])
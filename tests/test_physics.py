@@ -5,7 +5,10 @@ from src.physics import (
     calculate_E_cm_prime,
     calculate_E_prime,
     elastic_scattering,
-    sample_new_direction_cosines
+    sample_new_direction_cosines,
+    sample_collision,
+    SCATTER,
+    CAPTURE,
 )
 from src.vt_calc import VelocitySampler
 from src.random_number_generator import RNGHandler
@@ -44,6 +47,16 @@ class TestEnergyConversions:
         # E_cm should be small, order of thermal energy
         assert 0.001 < E_cm < 1
 
+    def test_velocity_sampling_follows_numpy_seed(self):
+        """Target velocity sampling is reproducible under np.random.seed"""
+        sampler = VelocitySampler(mass=208 * 1.674927471e-27, temperature=294)
+        vn = np.sqrt(2 * 0.0253 * 1.602176634e-19 / 1.674927471e-27)
+
+        np.random.seed(123)
+        first = [sampler.sample_velocity(vn) for _ in range(5)]
+        np.random.seed(123)
+        assert [sampler.sample_velocity(vn) for _ in range(5)] == first
+
     def test_E_prime_calculation(self):
         """Test scattered energy calculation"""
         rng = RNGHandler(seed=42)
@@ -112,6 +125,31 @@ class TestScatteringPhysics:
         assert np.mean(mu_labs) > 0.05
 
 
+    def test_sample_collision_matches_elastic_scattering(self):
+        """Fused kernel selects the reaction from the tables and scatters like elastic_scattering"""
+        M = 16
+        grid = np.logspace(3, 7, M)
+        sigma = np.tile(np.array([0.45, 0.05, 0.0], dtype=np.float32), (M, 1))
+        tables = (grid, sigma, np.arange(M), np.log(1e3), (M - 1) / (np.log(1e7) - np.log(1e3)))
+
+        E, A, xi_mu = 1e6, 10.0, 0.3
+        Sigma_t, p_s, reaction, E_prime, mu_lab = sample_collision(
+            E, 0.5, xi_mu, tables, A
+        )
+        assert Sigma_t == pytest.approx(0.5)
+        assert p_s == pytest.approx(0.9)
+        assert reaction == SCATTER
+        assert sample_collision(E, 0.95, xi_mu, tables, A)[2] == CAPTURE
+
+        class FixedRNG:
+            def random(self):
+                return xi_mu
+
+        sampler = VelocitySampler(mass=10 * 1.674927471e-27, temperature=294)
+        E_ref, _, mu_ref = elastic_scattering(E, A, sampler, FixedRNG())
+        assert E_prime == pytest.approx(E_ref)
+        assert mu_lab == pytest.approx(mu_ref)
+
 class TestDirectionSampling:
     """Test direction cosine sampling"""
 
@@ -153,6 +191,18 @@ class TestDirectionSampling:
         assert w_new == pytest.approx(-mu_lab, abs=1e-6)
 
 
+    def test_scattering_angle_near_pole(self):
+        """Scattering cosine is preserved for directions close to the z-axis"""
+        rng = RNGHandler(seed=42)
+        w = 0.9999999
+        u, v = np.sqrt(1 - w**2), 0.0
+        mu_lab = 0.3
+        for _ in range(100):
+            u_new, v_new, w_new, _ = sample_new_direction_cosines(u, v, w, mu_lab, rng)
+            assert u * u_new + v * v_new + w * w_new == pytest.approx(mu_lab, abs=1e-9)
+            assert u_new**2 + v_new**2 + w_new**2 == pytest.approx(1.0, abs=1e-12)
+
+
 class TestVelocitySampler:
     """Test target velocity sampling"""
 
@@ -205,6 +255,20 @@ class TestRNGHandler:
         seq2 = [rng2.random() for _ in range(10)]
         assert seq1 == seq2
 
+    def test_rng_batches_follow_generator_stream(self):
+        ss = np.random.SeedSequence(12345).spawn(2)[1]
+        rng = RNGHandler(ss, batch_size=4)
+        expected = np.random.default_rng(ss).random(10)
+        assert [rng.random() for _ in range(10)] == expected.tolist()
+
+    def test_rng_choice_continues_generator_stream(self):
+        rng = RNGHandler(seed=7, batch_size=4)
+        ref = np.random.default_rng(7)
+        first = [rng.random() for _ in range(3)]
+        assert first == ref.random(3).tolist()
+        assert rng.choice(10, size=5).tolist() == ref.choice(10, size=5).tolist()
+        assert rng.random() == ref.random()
+
     def test_rng_uniform_range(self):
         rng = RNGHandler(seed=42)
         samples = [rng.uniform(5, 10) for _ in range(1000)]
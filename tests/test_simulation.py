@@ -0,0 +1,58 @@
+import pytest
+import numpy as np
+from src.medium import Region, Sphere
+from src.settings import Settings
+from src.simulation import simulate_particle_chunk, RESULT_DT, ESCAPED, ABSORBED
+from src.tally import Tally
+from tests.mock_components import MockReader
+
+
+def test_chunk_returns_result_records():
+    """
+    Pure absorber sphere in analog mode: every particle is either absorbed
+    or escapes, and the chunk result merges into the same tally counts.
+    """
+    sphere = Region(surfaces=[Sphere((0, 0, 0), 5.0)], name="Absorber", element="X")
+    reader = MockReader(sigma_s=0.0, sigma_a=0.2)
+    settings = Settings(mode="criticality")
+
+    n = 50
+    states = [
+        {"x": 0.0, "y": 0.0, "z": 0.0, "theta": 1.0, "phi": 0.5,
+         "has_interacted": False, "energy": 1e6, "weight": 1.0}
+        for _ in range(n)
+    ]
+    seed_seqs = np.random.SeedSequence(7).spawn(n)
+
+    records, absorbed_events, trajectories = simulate_particle_chunk(
+        (states, reader, [sphere], 10.0, 1.0, None, None, False, seed_seqs, settings)
+    )
+
+    assert records.dtype == RESULT_DT
+    assert len(records) == n
+    assert trajectories is None
+    assert set(np.unique(records["code"])) <= {ESCAPED, ABSORBED}
+
+    absorbed = records["code"] == ABSORBED
+    assert absorbed_events.shape == (absorbed.sum(), 4)
+    assert records["absorbed_w"][absorbed].tolist() == [1.0] * absorbed.sum()
+
+    tally = Tally()
+    tally.merge_chunk_results(records, absorbed_events)
+    assert tally.results["escaped"] == n - absorbed.sum()
+    assert tally.results["absorbed"] == absorbed.sum()
+    assert tally.energy_count == n
+    assert sum(tally.energy_sums) == records["E"].sum()
+    assert tally.absorption_events == len(absorbed_events)
+    assert len(tally.absorbed_coordinates) == len(absorbed_events)
+
+    results = tally.get_results()
+    assert results["energy_spectrum"] == []  # Chunk merges only keep the sums
+    assert results["energy_count"] == n
+    assert results["average_energy"] == pytest.approx(records["E"].mean())
+
+    # Mesh-scoring callers count the events without storing them
+    scored = Tally()
+    scored.merge_chunk_results(records, absorbed_events, keep_coordinates=False)
+    assert scored.absorbed_coordinates == []
+    assert scored.absorption_events == len(absorbed_events)
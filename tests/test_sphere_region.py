@@ -0,0 +1,72 @@
+import pytest
+import numpy as np
+from src.medium import Region, Sphere, Box
+from src.geometry import calculate_nearest_boundary
+
+
+def test_intersector_only_for_single_sphere():
+    sphere_region = Region(surfaces=[Sphere((0, 0, 0), 10.0)], name="Sphere")
+    assert sphere_region._intersect is not None
+
+    box = Box(0, 10, 0, 10, 0, 10)
+    assert box._intersect is None
+
+    outside = Region(surfaces=[Sphere((0, 0, 0), 10.0)], operation="complement")
+    assert outside._intersect is None
+
+    # Rebuilt whenever the surface list changes
+    sphere_region.add_surface(Sphere((5, 0, 0), 10.0))
+    assert sphere_region._intersect is None
+    sphere_region.surfaces = [Sphere((0, 0, 0), 5.0)]
+    assert sphere_region._intersect(0.0, 0.0, 0.0, 1.0, 0.0, 0.0) == pytest.approx(5.0)
+
+
+def test_compiled_sphere_matches_generic_path():
+    """The specialized intersection must agree with the CSG search"""
+    generic = Region(surfaces=[Sphere((1, -2, 0.5), 10.0)], name="Generic")
+    compiled = Region(surfaces=[Sphere((1, -2, 0.5), 10.0)], name="Compiled")
+    # Force the generic path on an otherwise identical region
+    generic._intersect = None
+
+    rng = np.random.default_rng(42)
+    for _ in range(200):
+        # Points both inside and outside the sphere
+        x, y, z = rng.uniform(-20, 20, 3)
+        mu = 2 * rng.random() - 1
+        phi = 2 * np.pi * rng.random()
+        u, v, w = np.sqrt(1 - mu**2) * np.cos(phi), np.sqrt(1 - mu**2) * np.sin(phi), mu
+        state = {"x": x, "y": y, "z": z}
+
+        point_g, region_g, dist_g = calculate_nearest_boundary(state, [generic], u, v, w)
+        point_c, region_c, dist_c = calculate_nearest_boundary(state, [compiled], u, v, w)
+
+        if point_g is None:
+            assert point_c is None
+            assert dist_c == float("inf")
+        else:
+            assert region_c is compiled
+            assert dist_c == pytest.approx(dist_g, rel=1e-9, abs=1e-9)
+            assert point_c == pytest.approx(point_g, abs=1e-9)
+
+
+def test_single_primitive_flag():
+    """Only a lone primitive of an intersection/union region skips contains()"""
+    assert Region(surfaces=[Sphere((0, 0, 0), 10.0)])._single_primitive
+    assert not Region(surfaces=[Sphere((0, 0, 0), 10.0)], operation="complement")._single_primitive
+    assert not Box(0, 10, 0, 10, 0, 10)._single_primitive
+    assert not Region(surfaces=[Box(0, 10, 0, 10, 0, 10)])._single_primitive
+
+    region = Region(surfaces=[Sphere((0, 0, 0), 10.0)])
+    region.add_surface(Sphere((5, 0, 0), 10.0))
+    assert not region._single_primitive
+
+
+def test_compiled_region_pickles_without_intersector():
+    """The compiled distance function is dropped on pickling and rebuilt on loading"""
+    import pickle
+
+    region = Region(surfaces=[Sphere((0, 0, 0), 10.0)], name="Sphere")
+    assert region.__getstate__()["_intersect"] is None
+
+    clone = pickle.loads(pickle.dumps(region))
+    assert clone._intersect(0.0, 0.0, 0.0, 1.0, 0.0, 0.0) == pytest.approx(10.0)